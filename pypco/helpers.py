@@ -0,0 +1,142 @@
+"""Internal helper objects and functions for pypco."""
+
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Collapse repeated slashes in URLs, leaving the scheme separator intact
+_DOUBLE_SLASH_RE = re.compile(r'(?<!:)/{2,}')
+
+# Digits within a phone number
+_DIGITS_RE = re.compile(r'\d+')
+
+# Marks a cache miss, since None is a valid cached value
+MISSING = object()
+
+class LRUCache():
+    """A small thread-safe cache that discards the least recently used items.
+
+    Args:
+        maxsize (int): The maximum number of items to keep. A cache of size 0 stores nothing.
+        ttl (int): How long (seconds) each item is kept after it is added. Items never expire
+            if this is None, the default.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get an item from the cache.
+
+        Args:
+            key (obj): The key of the item to get.
+
+        Returns:
+            obj: The cached item, or MISSING if it isn't in the cache or has expired.
+        """
+
+        with self._lock:
+            try:
+                expires, value = self._items[key]
+            except KeyError:
+                return MISSING
+
+            if expires is not None and time.monotonic() >= expires:
+                del self._items[key]
+                return MISSING
+
+            self._items.move_to_end(key)
+
+            return value
+
+    def put(self, key, value):
+        """Add an item to the cache, discarding the oldest item if the cache is full.
+
+        Args:
+            key (obj): The key of the item to add.
+            value (obj): The item to add.
+        """
+
+        expires = None if self._ttl is None else time.monotonic() + self._ttl
+
+        with self._lock:
+            self._items[key] = (expires, value)
+            self._items.move_to_end(key)
+
+            if len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """Remove every item from the cache."""
+
+        with self._lock:
+            self._items.clear()
+
+@functools.lru_cache(maxsize=256)
+def clean_url(api_base, url):
+    """Prefix a URL with the API base if necessary and collapse repeated slashes.
+
+    Results are cached, so repeated requests against the same URL (such as each
+    page of an iteration) don't need to be cleaned again.
+
+    Args:
+        api_base (str): The base URL against which REST calls will be made.
+        url (str): The URL to be cleaned.
+
+    Returns:
+        str: The cleaned URL.
+    """
+
+    url = url if url.startswith(api_base) else f'{api_base}{url}'
+
+    # Most URLs have no repeated slashes outside of the scheme; skip the regex for those
+    scheme_end = url.find('://')
+
+    if scheme_end == -1:
+        has_repeats = '//' in url
+    else:
+        has_repeats = url.find('//', 0, scheme_end) != -1 or \
+            url.find('//', scheme_end + 2) != -1
+
+    if not has_repeats:
+        return url
+
+    return _DOUBLE_SLASH_RE.sub('/', url)
+
+def primary_email(items):
+    """Find the primary email address among a list of PCO objects.
+
+    Args:
+        items (list): PCO objects; any that aren't Emails are ignored.
+
+    Returns:
+        str: The primary email address in lowercase, or None if there isn't one.
+    """
+
+    for i in items:
+        if i['type'] == 'Email' and i['attributes']['primary']:
+            return i['attributes']['address'].lower()
+
+    return None
+
+def primary_phone_number(items):
+    """Find the primary phone number among a list of PCO objects.
+
+    Args:
+        items (list): PCO objects; any that aren't PhoneNumbers are ignored.
+
+    Returns:
+        str: The digits of the primary phone number, or None if there isn't one.
+    """
+
+    for i in items:
+        if i['type'] == 'PhoneNumber' and i['attributes']['primary']:
+            return ''.join(_DIGITS_RE.findall(i['attributes']['number']))
+
+    return None
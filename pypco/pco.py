@@ -1,16 +1,35 @@
 """The primary module for pypco containing main wrapper logic."""
 
+import os
 import time
 import logging
-import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from .auth_config import PCOAuthConfig
+from .helpers import LRUCache, MISSING, clean_url, primary_email, primary_phone_number
 from .exceptions import PCORequestTimeoutException, \
     PCORequestException, PCOUnexpectedRequestException
 
-class PCO(): #pylint: disable=too-many-instance-attributes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+# How long (seconds) person details are cached by the person lookup helpers
+_PERSON_CACHE_TTL = 300
+
+class PCO(): #pylint: disable=too-many-instance-attributes,too-many-public-methods
     """The entry point to the PCO API.
 
     Note:
@@ -29,6 +48,10 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             Default: https://upload.planningcenteronline.com/v2/files
         upload_timeout (int): How long to wait (seconds) for uploads to timeout. Default 300.
         timeout_retries (int): How many times to retry requests that have timed out. Default 3.
+        max_workers (int): How many requests helper functions may run concurrently when
+            fetching details for each object in a listing. Default 8.
+        cache_person_details (bool): Whether get_person_email and get_person_phone_number
+            should cache their results for five minutes. Default True.
     """
 
     def __init__( #pylint: disable=too-many-arguments
@@ -41,6 +64,8 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             upload_url='https://upload.planningcenteronline.com/v2/files',
             upload_timeout=300,
             timeout_retries=3,
+            max_workers=8,
+            cache_person_details=True,
         ):
 
         self._log = logging.getLogger(__name__)
@@ -56,8 +81,37 @@ class PCO(): #pylint: disable=too-many-instance-attributes
 
         self.timeout_retries = timeout_retries
 
+        self.max_workers = max_workers
+
+        # Cleared while waiting out a rate limit so that concurrent requests
+        # share a single back-off instead of each triggering their own
+        self._ratelimit_gate = threading.Event()
+        self._ratelimit_gate.set()
+        self._ratelimit_lock = threading.Lock()
+
+        # Briefly cache person details for callers that look up the same people repeatedly;
+        # a cache of size 0 stores nothing, which disables caching
+        cache_size = 4096 if cache_person_details else 0
+        self._email_cache = LRUCache(cache_size, ttl=_PERSON_CACHE_TTL)
+        self._phone_number_cache = LRUCache(cache_size, ttl=_PERSON_CACHE_TTL)
+
+        # Keep a pool of persistent connections per host so that repeated
+        # requests (pagination, etc.) reuse existing TLS connections
         self.session = requests.Session()
 
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Close the session deterministically once this object is collected
+        self._finalizer = weakref.finalize(self, self.session.close)
+
+        # Static headers sent with every request
+        self.session.headers.update({
+            'User-Agent': 'pypco',
+            'Authorization': self._auth_header,
+        })
+
         self._log.debug("Pypco has been initialized!")
 
     def _do_request(self, method, url, payload=None, upload=None, **params):
@@ -76,44 +130,42 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             requests.Response: The response to this request.
         """
 
-        # Standard header
-        headers = {
-            'User-Agent': 'pypco',
-            'Authorization': self._auth_header,
-        }
-
-        # Standard params
+        # Standard params; static headers are set on the session
         request_params = {
-            'headers':headers,
             'params':params,
             'json':payload,
             'timeout': self.upload_timeout if upload else self.timeout
         }
 
-        # Add files param if upload specified
-        if upload:
-            upload_fh = open(upload, 'rb')
-            request_params['files'] = {'file': upload_fh}
+        with ExitStack() as stack:
 
-        self._log.debug(
-            "Executing %s request to '%s' with args %s",
-            method,
-            url,
-            {param:value for (param, value) in request_params.items() if param != 'headers'}
-        )
+            # Add file payload if upload specified; the file is closed even if the request fails
+            if upload:
+                upload_fh = stack.enter_context(open(upload, 'rb'))
 
-        # The moment we've been waiting for...execute the request
-        try:
-            response = self.session.request(
+                if MultipartEncoder is not None:
+                    # Stream the file from disk rather than buffering it in memory
+                    encoder = MultipartEncoder(
+                        fields={'file': (os.path.basename(upload), upload_fh)}
+                    )
+                    request_params['data'] = encoder
+                    request_params['headers'] = {'Content-Type': encoder.content_type}
+                else:
+                    request_params['files'] = {'file': upload_fh}
+
+            self._log.debug(
+                "Executing %s request to '%s' with args %s",
                 method,
                 url,
-                **request_params
+                request_params
             )
-        finally:
-            if upload:
-                upload_fh.close()
 
-        return response
+            # The moment we've been waiting for...execute the request
+            return self.session.request(
+                method,
+                url,
+                **request_params
+            )
 
     def _do_timeout_managed_request(self, method, url, payload=None, upload=None, **params):
         """Performs a single request against the PCO API with automatic retried in case of timeout.
@@ -179,13 +231,32 @@ class PCO(): #pylint: disable=too-many-instance-attributes
 
         while True:
 
+            # Hold off while another thread is waiting out the rate limit
+            self._ratelimit_gate.wait()
+
             response = self._do_timeout_managed_request(method, url, payload, upload, **params)
 
             if response.status_code == 429:
-                self._log.debug("Received rate limit response. Will try again after %d sec(s).", \
-                    int(response.headers['Retry-After']))
+                # Parse before closing the gate so a bad header can't leave it closed
+                retry_after = int(response.headers['Retry-After'])
+
+                with self._ratelimit_lock:
+                    backing_off = not self._ratelimit_gate.is_set()
+                    self._ratelimit_gate.clear()
+
+                # Only one thread sleeps; the others queue up at the gate
+                if backing_off:
+                    continue
+
+                try:
+                    self._log.debug( \
+                        "Received rate limit response. Will try again after %d sec(s).", \
+                        retry_after)
+
+                    time.sleep(retry_after)
+                finally:
+                    self._ratelimit_gate.set()
 
-                time.sleep(int(response.headers['Retry-After']))
                 continue
 
             return response
@@ -212,8 +283,7 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         self._log.debug("URL cleaning input: \"%s\"", url)
 
         if not upload:
-            url = url if url.startswith(self.api_base) else f'{self.api_base}{url}'
-            url = re.subn(r'(?<!:)[/]{2,}', '/', url)[0]
+            url = clean_url(self.api_base, url)
 
         self._log.debug("URL cleaning output: \"%s\"", url)
 
@@ -282,7 +352,13 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             dict: The payload from the response to this request.
         """
 
-        return self.request_response(method, url, payload, upload, **params).json()
+        response = self.request_response(method, url, payload, upload, **params)
+
+        # Decode directly from bytes with orjson if it's available
+        if orjson is not None:
+            return orjson.loads(response.content)
+
+        return response.json()
 
     def get(self, url, **params):
         """Perform a GET request against the PCO API.
@@ -390,6 +466,9 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         Objects specified as includes will be injected into their associated
         object and returned.
 
+        The next page is requested in the background while the current page is
+        processed, so if you stop iterating early one extra page may be fetched.
+
         Args:
             url (str): The URL against which to perform the request. Can include
                 what's been set as api_base, which will be ignored if this value is also
@@ -413,49 +492,136 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             specific objects since they are accessible directly from each returned object.
         """
 
-        while True: #pylint: disable=too-many-nested-blocks
+        pages = self._iterate_pages(url, offset, per_page, **params)
 
-            response = self.get(url, offset=offset, per_page=per_page, **params)
+        for response in pages: #pylint: disable=too-many-nested-blocks
+
+            # Index includes by type and id so each relationship is a single lookup
+            included = {
+                (include['type'], include['id']): include
+                for include in response.get('included', ())
+            }
+
+            # Page-level meta is the same for every record on the page
+            meta = {
+                key: response['meta'][key]
+                for key in ('can_include', 'parent')
+                if key in response['meta']
+            }
 
             for cur in response['data']:
                 record = {
                     'data': cur,
                     'included': [],
-                    'meta': {}
+                    'meta': dict(meta)
                 }
 
-                if 'can_include' in response['meta']:
-                    record['meta']['can_include']: response['meta']['can_include']
-
-                if 'parent' in response['meta']:
-                    record['meta']['parent']: response['meta']['parent']
-
-                if 'relationships' in cur:
+                # Nothing to attach if the page has no includes
+                if included and 'relationships' in cur:
                     for key in cur['relationships']:
                         relationships = cur['relationships'][key]['data']
 
                         if relationships is not None:
                             if isinstance(relationships, dict):
-                                for include in response['included']:
-                                    if include['type'] == relationships['type'] and \
-                                        include['id'] == relationships['id']:
+                                relationships = [relationships]
 
-                                        record['included'].append(include)
+                            for relationship in relationships:
+                                include = included.get(
+                                    (relationship['type'], relationship['id'])
+                                )
 
-                            elif isinstance(relationships, list):
-                                for relationship in relationships:
-                                    for include in response['included']:
-                                        if include['type'] == relationship['type'] and \
-                                            include['id'] == relationship['id']:
-
-                                            record['included'].append(include)
+                                if include is not None:
+                                    record['included'].append(include)
 
                 yield record
 
-            offset += per_page
+    def iterate_data_only(self, url, offset=0, per_page=25, **params):
+        """Iterate the data objects in a response, handling pagination.
+
+        A lighter-weight alternative to iterate() for when only each object's
+        "data" node is needed. Includes and meta are not processed, so this is
+        somewhat faster for large listings. As with iterate(), one extra page may
+        be fetched if you stop iterating early.
+
+        Args:
+            url (str): The URL against which to perform the request. Can include
+                what's been set as api_base, which will be ignored if this value is also
+                present in your URL.
+            offset (int): The offset at which to start. Usually going to be 0 (the default).
+            per_page (int): The number of results that should be requested in a single page.
+                Valid values are 1 - 100, defaults to the PCO default of 25.
+            params: Any additional named arguments will be passed as query parameters. Values must
+                be of type str!
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Yields:
+            dict: The "data" node of each object returned by the API for this request.
+        """
+
+        for response in self._iterate_pages(url, offset, per_page, **params):
+            yield from response['data']
+
+    def _iterate_pages(self, url, offset=0, per_page=25, **params):
+        """Iterate the pages of a paginated response.
+
+        While each page is being processed by the caller, the following page
+        (if there is one) is requested in the background so that network
+        latency overlaps with the caller's work. If the caller stops iterating
+        early, the request for that next page may already have been sent; it is
+        left to finish in the background and its result is discarded.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            offset (int): The offset at which to start.
+            per_page (int): The number of results that should be requested in a single page.
+            params: Any additional named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Yields:
+            dict: The payload returned by the API for each page.
+        """
+
+        prefetch = ThreadPoolExecutor(max_workers=1)
+        next_response = None
+
+        try:
+            response = self.get(url, offset=offset, per_page=per_page, **params)
+
+            while True:
+                next_response = None
+
+                if 'next' in response['links']:
+                    offset += per_page
+
+                    next_response = prefetch.submit(
+                        self.get,
+                        url,
+                        offset=offset,
+                        per_page=per_page,
+                        **params
+                    )
+
+                yield response
+
+                if next_response is None:
+                    break
+
+                response = next_response.result()
+
+        finally:
+            # If the caller stopped early, don't wait on a page they'll never see
+            if next_response is not None:
+                next_response.cancel()
 
-            if not 'next' in response['links']:
-                break
+            prefetch.shutdown(wait=False)
 
     def upload(self, file_path, **params):
         """Upload the file at the specified path to PCO.
@@ -476,10 +642,38 @@ class PCO(): #pylint: disable=too-many-instance-attributes
 
         return self.request_json('POST', self.upload_url, upload=file_path, **params)
 
-    def __del__(self):
-        """Close the requests session when the PCO object goes out of scope."""
+    def close(self):
+        """Close the requests session, releasing any pooled connections.
 
-        self.session.close()
+        The session is also closed automatically when the PCO object is garbage
+        collected or when leaving a with block, so calling this is optional.
+        """
+
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _map_concurrently(self, func, items):
+        """Apply a function to each item using a bounded pool of worker threads.
+
+        Used by helper functions that issue one request per object in a listing;
+        requests are I/O bound, so running them concurrently overlaps their latency.
+        All workers share the PCO session and its connection pool.
+
+        Args:
+            func (function): The function to be called with each item.
+            items (list): The items to which func will be applied.
+
+        Returns:
+            list: The results of func for each item, in the same order as items.
+        """
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(func, items))
 
     @staticmethod
     def template(object_type, attributes=None):
@@ -509,8 +703,8 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             Returns:
                 dict: The payload returned by the API for this request.
         """
-    # PCO API endpoint for running a given List
-    return self.post(f"/people/v2/lists/{pco_list_id}/run")
+        # PCO API endpoint for running a given List
+        return self.post(f"/people/v2/lists/{pco_list_id}/run")
 
 
     def get_list_attr(self, pco_list_id):
@@ -574,24 +768,22 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         """
         # Endpoint for request for desired PCO List
         e = f"/people/v2/lists/{pco_list_id}/people"
-        # List of People data
-        d = self.iterate(e, per_page=100)
+        # List of People data, with their Emails and Phone Numbers included
+        d = self.iterate(e, per_page=100, include='emails,phone_numbers')
         l = []
-        # Ensure List has People
-        if d:
-            # Iterate over List People
-            for i in d:
-                # Ensure Person
-                if i['data']['type'] == 'Person':
-                    # Append Person
-                    l.append(
-                        {
-                            'PersonID': i['data']['id'],
-                            'PersonName': i['data']['attributes']['name'],
-                            'EmailAddress': get_person_email(i['data']['id']),
-                            'PhoneNumber': get_person_phone_number(i['data']['id'])
-                        }
-                    )
+        # Iterate over List People
+        for i in d:
+            # Ensure Person
+            if i['data']['type'] == 'Person':
+                # Append Person
+                l.append(
+                    {
+                        'PersonID': i['data']['id'],
+                        'PersonName': i['data']['attributes']['name'],
+                        'EmailAddress': primary_email(i['included']),
+                        'PhoneNumber': primary_phone_number(i['included'])
+                    }
+                )
         # Return list of People dicts
         return l
 
@@ -605,19 +797,23 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             Returns:
                 str: person@domain.com
 
+            Note:
+                Results are cached for five minutes unless the PCO object was created with
+                cache_person_details=False. Use clear_person_cache() to discard them sooner.
+
         """
+        # Return cached Email if we've already looked this Person up
+        email = self._email_cache.get(str(pco_person_id))
+        if email is not MISSING:
+            return email
         # Endpoint for request
         e = f"/people/v2/people/{pco_person_id}/emails"
         # List of Email data
         d = self.get(e)
-        # Ensure Person has Email(s)
-        if d:
-            # Iterate over Email(s)
-            for i in d['data']:
-                # Ensure primary Email
-                if i['type'] == 'Email' and i['attributes']['primary']:
-                    # Return Email
-                    return (i['attributes']['address'].lower())
+        # Cache and return primary Email
+        email = primary_email(d['data'])
+        self._email_cache.put(str(pco_person_id), email)
+        return email
 
 
     def get_person_phone_number(self, pco_person_id):
@@ -629,19 +825,34 @@ class PCO(): #pylint: disable=too-many-instance-attributes
             Returns:
                 str: 1234567890
 
+            Note:
+                Results are cached for five minutes unless the PCO object was created with
+                cache_person_details=False. Use clear_person_cache() to discard them sooner.
+
         """
+        # Return cached Phone Number if we've already looked this Person up
+        phone_number = self._phone_number_cache.get(str(pco_person_id))
+        if phone_number is not MISSING:
+            return phone_number
         # Endpoint for request
         e = f"/people/v2/people/{pco_person_id}/phone_numbers"
         # List of Phone Number data
         d = self.get(e)
-        # Ensure Person has Phone Number(s)
-        if d:
-            # Iterate over Phone Number(s)
-            for i in d['data']:
-                # Ensure primary Phone Number
-                if i['type'] == 'PhoneNumber' and i['attributes']['primary']:
-                    # Return Phone Number
-                    return ''.join(re.findall(r'\d+', i['attributes']['number']))
+        # Cache and return primary Phone Number
+        phone_number = primary_phone_number(d['data'])
+        self._phone_number_cache.put(str(pco_person_id), phone_number)
+        return phone_number
+
+
+    def clear_person_cache(self):
+        """ Discards the results cached by get_person_email and get_person_phone_number.
+
+            Call this after changing a person's emails or phone numbers so that
+            the next lookup reflects the change.
+
+        """
+        self._email_cache.clear()
+        self._phone_number_cache.clear()
 
 
     def get_teams(self):
@@ -659,23 +870,22 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         # Endpoint for request
         e = "/services/v2/teams"
         # List of Team data
-        d = self.iterate(e, per_page=100)
+        d = self.iterate_data_only(e, per_page=100)
+        # Collect Teams, ensuring each is a Team
+        t = [i for i in d if i['type'] == 'Team']
+        # Lists of People in each Team, fetched concurrently
+        p = self._map_concurrently(lambda team: self.get_team_members(team['id']), t)
         l = []
-        # Iterate over Teams
-        for i in d:
-            # Ensure Team
-            if i['data']['type'] == 'Team':
-                # List of People in Team
-                p = get_pco_team_members(i['data']['id'])
-                # Iterate over People
-                for j in p:
-                    # Append Team
-                    l.append(
-                        {
-                            'TeamName': i['data']['attributes']['name'],
-                            'PersonID': j
-                        }
-                    )
+        # Iterate over Teams and their People
+        for team, members in zip(t, p):
+            for j in members:
+                # Append Team
+                l.append(
+                    {
+                        'TeamName': team['attributes']['name'],
+                        'PersonID': j
+                    }
+                )
         # Return list of Team dicts
         return l
 
@@ -693,17 +903,15 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         # Endpoint for request
         e = f"/services/v2/teams/{pco_team_id}/people"
         # List of Team People data
-        d = self.iterate(e, per_page=100)
+        d = self.iterate_data_only(e, per_page=100)
         l = []
-        # Ensure Team has People
-        if d:
-            # Iterate over Team People
-            for i in d:
-                # Ensure Person
-                if i['data']['type'] == 'Person':
-                    # Append Person
-                    l.append(i['data']['id'])
-            # Return list of People
+        # Iterate over Team People
+        for i in d:
+            # Ensure Person
+            if i['type'] == 'Person':
+                # Append Person
+                l.append(i['id'])
+        # Return list of People
         return l
 
 
@@ -723,23 +931,22 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         # Endpoint for request
         e = "/groups/v2/groups"
         # List of Group data
-        d = self.iterate(e, per_page=100)
+        d = self.iterate_data_only(e, per_page=100)
+        # Collect Groups, ensuring each is a Group
+        g = [i for i in d if i['type'] == 'Group']
+        # Lists of People in each Group, fetched concurrently
+        p = self._map_concurrently(lambda group: self.get_group_members(group['id']), g)
         l = []
-        # Iterate over Groups
-        for i in d:
-            # Ensure Group
-            if i['data']['type'] == 'Group':
-                 # List of People in Group
-                p = get_pco_group_members(i['data']['id'])
-                # Iterate over People
-                for j in p:
-                    # Append Group
-                    l.append(
-                        {
-                            'GroupName': i['data']['attributes']['name'],
-                            'PersonID': j
-                        }
-                    )
+        # Iterate over Groups and their People
+        for group, members in zip(g, p):
+            for j in members:
+                # Append Group
+                l.append(
+                    {
+                        'GroupName': group['attributes']['name'],
+                        'PersonID': j
+                    }
+                )
         # Return list of Group dicts
         return l
 
@@ -756,16 +963,14 @@ class PCO(): #pylint: disable=too-many-instance-attributes
         """
         # Endpoint for request
         e = f"/groups/v2/groups/{pco_group_id}/people"
-        # List of Team People data
-        d = self.iterate(e, per_page=100)
+        # List of Group People data
+        d = self.iterate_data_only(e, per_page=100)
         l = []
-        # Ensure Group has People
-        if d:
-            # Iterate over People
-            for i in d:
-                # Ensure Person
-                if i['data']['type'] == 'Person':
-                    # Append Person
-                    l.append(i['data']['id'])
+        # Iterate over Group People
+        for i in d:
+            # Ensure Person
+            if i['type'] == 'Person':
+                # Append Person
+                l.append(i['id'])
         # Return list of People
         return l
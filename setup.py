@@ -27,6 +27,14 @@ setup(
     install_requires=[
         'requests'
     ],
+    extras_require={
+        'fast': [
+            'orjson'
+        ],
+        'upload': [
+            'requests-toolbelt'
+        ]
+    },
     zip_safe=True,
     classifiers=[
         'Development Status :: 5 - Production/Stable',
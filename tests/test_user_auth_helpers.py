@@ -1,197 +1,235 @@
 """Test pypco utility methods."""
 
 import unittest
+import urllib.parse
 from unittest import mock
 
+import requests
 from requests import HTTPError
 from requests import ConnectionError as RequestsConnectionError
 from requests import Timeout
 
 import pypco
+from pypco import get_browser_redirect_url
+from pypco import get_oauth_access_token
+from pypco import get_oauth_refresh_token
 from pypco.exceptions import PCORequestException
 from pypco.exceptions import PCORequestTimeoutException
 from pypco.exceptions import PCOUnexpectedRequestException
 
-def mock_oauth_response(*args, **kwargs): #pylint: disable=E0211
-    """Provide mocking for an oauth request
+class MockOAuthResponse:
+    """Mocking class for OAuth response
 
-    Read more about this technique for mocking HTTP requests here:
-    https://stackoverflow.com/questions/15753390/python-mock-requests-and-the-response/28507806#28507806
+        Args:
+            json_data (dict): JSON data returned by the mocked API.
+            status_code (int): The HTTP status code returned by the mocked API.
     """
 
-    class MockOAuthResponse:
-        """Mocking class for OAuth response
+    def __init__(self, json_data, status_code):
 
-            Args:
-                json_data (dict): JSON data returned by the mocked API.
-                status_code (int): The HTTP status code returned by the mocked API.
-        """
+        self.json_data = json_data
+        self.status_code = status_code
+        self.text = '{"test_key": "test_value"}'
 
-        def __init__(self, json_data, status_code):
+    def json(self):
+        """Return our mock JSON data"""
 
-            self.json_data = json_data
-            self.status_code = status_code
-            self.text = '{"test_key": "test_value"}'
+        return self.json_data
 
-        def json(self):
-            """Return our mock JSON data"""
+    def raise_for_status(self):
+        """Raise HTTP exception if status code >= 400."""
 
-            return self.json_data
+        if 400 <= self.status_code <= 500:
+            raise HTTPError(
+                u'%s Client Error: %s for url: %s' % \
+                    (
+                        self.status_code,
+                        'Unauthorized',
+                        'https://api.planningcenteronline.com/oauth/token'
+                    ),
+                response=self
+            )
 
-        def raise_for_status(self):
-            """Raise HTTP exception if status code >= 400."""
+# Mocked API payloads
+GOOD_ACCESS_TOKEN = {
+    'access_token': '863300f2f093e8be25fdd7f40f218f4276ecf0b5814a558d899730fcee81e898', #pylint: disable=C0301
+    'token_type': 'bearer',
+    'expires_in': 7200,
+    'refresh_token': '63d68cb3d8a46eea1c842f5ba469b2940a88a657992f915206be1253a175b6ad', #pylint: disable=C0301
+    'scope': 'people',
+    'created_at': 1516054388
+}
+
+BAD_ACCESS_TOKEN = {
+    'error': 'invalid_client',
+    'error_description': 'Client authentication failed due to unknown client, no client authentication included, or unsupported authentication method.' #pylint: disable=C0301
+}
+
+GOOD_REFRESH_TOKEN = {
+    'access_token': '863300f2f093e8be25fdd7f40f218f4276ecf0b5814a558d899730fcee81e898', #pylint: disable=C0301
+    'token_type': 'bearer',
+    'expires_in': 7200,
+    'refresh_token': '63d68cb3d8a46eea1c842f5ba469b2940a88a657992f915206be1253a175b6ad', #pylint: disable=C0301
+    'created_at': 1516054388
+}
+
+BAD_REFRESH_TOKEN = {
+    'error': 'invalid_request',
+    'error_description': 'The refresh token is no longer valid'
+}
+
+# Mocked access token responses, keyed by the code sent in the request
+ACCESS_TOKEN_RESPONSES = {
+    'good': MockOAuthResponse(GOOD_ACCESS_TOKEN, 200),
+    'bad': MockOAuthResponse(BAD_ACCESS_TOKEN, 401),
+    'server_error': MockOAuthResponse({}, 500),
+}
+
+# Mocked refresh token responses, keyed by the refresh token sent in the request
+REFRESH_TOKEN_RESPONSES = {
+    'refresh_good': MockOAuthResponse(GOOD_REFRESH_TOKEN, 200),
+    'refresh_bad': MockOAuthResponse(BAD_REFRESH_TOKEN, 401),
+}
+
+# Exceptions raised by mocked access token requests, keyed by the code sent in the request
+ACCESS_TOKEN_ERRORS = {
+    'timeout': Timeout,
+    'connection': RequestsConnectionError,
+}
+
+# The client id and secret and the redirect URI sent in the _do_oauth_post tests
+DO_OAUTH_POST_CLIENT_ID = 'id'
+
+DO_OAUTH_POST_CLIENT_SECRET = 'secret'
+
+DO_OAUTH_POST_REDIRECT_URI = 'https://www.site.com'
+
+# The browser redirect URL expected for our test app, split into its components
+EXPECTED_REDIRECT_URL_BASE = ('https', 'api.planningcenteronline.com', '/oauth/authorize')
+
+EXPECTED_REDIRECT_URL_QUERY = {
+    'client_id': ['abc123'],
+    'redirect_uri': ['https://nowhere.com?someurl'],
+    'response_type': ['code'],
+}
 
-            if 400 <= self.status_code <= 500:
-                raise HTTPError(
-                    u'%s Client Error: %s for url: %s' % \
-                        (
-                            self.status_code,
-                            'Unauthorized',
-                            'https://api.planningcenteronline.com/oauth/token'
-                        ),
-                    response=self
-                )
+def mock_oauth_response(*args, **kwargs): #pylint: disable=E0211
+    """Provide mocking for an oauth request
+
+    Read more about this technique for mocking HTTP requests here:
+    https://stackoverflow.com/questions/15753390/python-mock-requests-and-the-response/28507806#28507806
+    """
 
     # If we have this attrib, we're getting an access token
     if 'code' in kwargs.get('data'):
         if args[0] != "https://api.planningcenteronline.com/oauth/token":
             return MockOAuthResponse(None, 404)
 
-        if kwargs.get('data')['code'] == 'good':
-            return MockOAuthResponse(
-                {
-                    'access_token': '863300f2f093e8be25fdd7f40f218f4276ecf0b5814a558d899730fcee81e898', #pylint: disable=C0301
-                    'token_type': 'bearer',
-                    'expires_in': 7200,
-                    'refresh_token': '63d68cb3d8a46eea1c842f5ba469b2940a88a657992f915206be1253a175b6ad', #pylint: disable=C0301
-                    'scope': 'people',
-                    'created_at': 1516054388
-                },
-                200
-            )
+        code = kwargs.get('data')['code']
 
-        if kwargs.get('data')['code'] == 'bad':
-            return MockOAuthResponse(
-                {
-                    'error': 'invalid_client',
-                    'error_description': 'Client authentication failed due to unknown client, no client authentication included, or unsupported authentication method.' #pylint: disable=C0301
-                },
-                401
-            )
+        if code in ACCESS_TOKEN_ERRORS:
+            raise ACCESS_TOKEN_ERRORS[code]()
 
-        if kwargs.get('data')['code'] == 'server_error':
-            return MockOAuthResponse(
-                {},
-                500
-            )
-
-        if kwargs.get('data')['code'] == 'timeout':
-            raise Timeout()
-
-        if kwargs.get('data')['code'] == 'connection':
-            raise RequestsConnectionError()
+        if code in ACCESS_TOKEN_RESPONSES:
+            return ACCESS_TOKEN_RESPONSES[code]
 
     # If we have this attrib, we're attempting a refresh
     if 'refresh_token' in kwargs.get('data'):
-        if kwargs.get('data')['refresh_token'] == 'refresh_good':
-            return MockOAuthResponse(
-                {
-                    'access_token': '863300f2f093e8be25fdd7f40f218f4276ecf0b5814a558d899730fcee81e898', #pylint: disable=C0301
-                    'token_type': 'bearer',
-                    'expires_in': 7200,
-                    'refresh_token': '63d68cb3d8a46eea1c842f5ba469b2940a88a657992f915206be1253a175b6ad', #pylint: disable=C0301
-                    'created_at': 1516054388
-                },
-                200
-            )
+        refresh_token = kwargs.get('data')['refresh_token']
 
-        if kwargs.get('data')['refresh_token'] == 'refresh_bad':
-            return MockOAuthResponse(
-                {
-                    'error': 'invalid_request',
-                    'error_description': 'The refresh token is no longer valid'
-                },
-                401
-            )
+        if refresh_token in REFRESH_TOKEN_RESPONSES:
+            return REFRESH_TOKEN_RESPONSES[refresh_token]
 
     return MockOAuthResponse(None, 400)
 
-class TestGetBrowserRedirectUrl(unittest.TestCase):
-    """Test pypco functionality for getting browser redirect URL."""
+# requests.post is patched once for every test in this module
+POST_PATCHER = mock.patch('requests.post', side_effect=mock_oauth_response)
 
-    def test_valid_url_single_scope(self):
-        """Test the get_browser_redirect_url function with one OAUTH scope."""
+def setUpModule(): #pylint: disable=invalid-name
+    """Start the module-wide requests.post patch."""
 
-        redirect_url = pypco.get_browser_redirect_url(
-            'abc123',
-            'https://nowhere.com?someurl',
-            ['people']
-        )
+    POST_PATCHER.start()
 
-        self.assertEqual(
-            "https://api.planningcenteronline.com/oauth/authorize?"
-            "client_id=abc123&redirect_uri=https%3A%2F%2Fnowhere.com%3Fsomeurl&"
-            "response_type=code&scope=people",
-            redirect_url
-        )
+def tearDownModule(): #pylint: disable=invalid-name
+    """Remove the module-wide requests.post patch."""
 
-    def test_valid_url_multiple_scopes(self):
-        """Test the get_browser_redirect_url function with multiple OAUTH scopes."""
+    POST_PATCHER.stop()
 
-        redirect_url = pypco.get_browser_redirect_url(
-            'abc123',
-            'https://nowhere.com?someurl',
-            ['people', 'giving']
-        )
+class MockedPostTestCase(unittest.TestCase):
+    """A base class for tests that make mocked OAUTH requests.
 
-        self.assertEqual(
-            "https://api.planningcenteronline.com/oauth/authorize?"
-            "client_id=abc123&redirect_uri=https%3A%2F%2Fnowhere.com%3Fsomeurl&"
-            "response_type=code&scope=people+giving",
-            redirect_url
-        )
+    Attributes:
+        mock_post (MagicMock): The mock standing in for requests.post.
+    """
+
+    def setUp(self):
+        """Clear calls made to the requests.post mock by previous tests."""
 
-class TestDoOAUTHPost(unittest.TestCase):
+        self.mock_post = requests.post
+        self.mock_post.reset_mock()
+
+class TestGetBrowserRedirectUrl(unittest.TestCase):
+    """Test pypco functionality for getting browser redirect URL."""
+
+    def test_valid_urls(self):
+        """Test the get_browser_redirect_url function with one and multiple OAUTH scopes."""
+
+        cases = [
+            (['people'], 'people'),
+            (['people', 'giving'], 'people giving'),
+        ]
+
+        for scopes, scope_param in cases:
+            with self.subTest(scopes=scopes):
+                redirect_url = urllib.parse.urlsplit(
+                    get_browser_redirect_url(
+                        'abc123',
+                        'https://nowhere.com?someurl',
+                        scopes
+                    )
+                )
+
+                self.assertEqual(
+                    EXPECTED_REDIRECT_URL_BASE,
+                    (redirect_url.scheme, redirect_url.netloc, redirect_url.path)
+                )
+
+                self.assertEqual(
+                    {**EXPECTED_REDIRECT_URL_QUERY, 'scope': [scope_param]},
+                    urllib.parse.parse_qs(redirect_url.query)
+                )
+
+class TestDoOAUTHPost(MockedPostTestCase):
     """Test the internal _do_oauth_post function."""
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_oauth_general_errors(self, mock_post): #pylint: disable=unused-argument
+    def test_oauth_general_errors(self):
         """Ensure error response with invalid status code"""
 
-        # Request timeout
-        with self.assertRaises(PCORequestTimeoutException):
-            pypco.user_auth_helpers._do_oauth_post( #pylint: disable=protected-access
-                'https://api.planningcenteronline.com/oauth/token',
-                client_id='id',
-                client_secret='secret',
-                code='timeout',
-                redirect_uri='https://www.site.com',
-                grant_type='authorization_code'
-            )
-
-        # Request connection error
-        with self.assertRaises(PCOUnexpectedRequestException):
-            pypco.user_auth_helpers._do_oauth_post( #pylint: disable=protected-access
-                'https://api.planningcenteronline.com/oauth/token',
-                client_id='id',
-                client_secret='secret',
-                code='connection',
-                redirect_uri='https://www.site.com',
-                grant_type='authorization_code'
-            )
+        for code, exception in (
+                ('timeout', PCORequestTimeoutException),
+                ('connection', PCOUnexpectedRequestException),
+        ):
+            with self.subTest(code=code), self.assertRaises(exception):
+                pypco.user_auth_helpers._do_oauth_post( #pylint: disable=protected-access
+                    'https://api.planningcenteronline.com/oauth/token',
+                    client_id=DO_OAUTH_POST_CLIENT_ID,
+                    client_secret=DO_OAUTH_POST_CLIENT_SECRET,
+                    code=code,
+                    redirect_uri=DO_OAUTH_POST_REDIRECT_URI,
+                    grant_type='authorization_code'
+                )
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_http_errors(self, mock_post): #pylint: disable=unused-argument
+    def test_http_errors(self):
         """Ensure error response with http errors."""
 
         # Incorrect code
         with self.assertRaises(PCORequestException):
             pypco.user_auth_helpers._do_oauth_post( #pylint: disable=protected-access
                 'https://api.planningcenteronline.com/oauth/token',
-                client_id='id',
-                client_secret='secret',
+                client_id=DO_OAUTH_POST_CLIENT_ID,
+                client_secret=DO_OAUTH_POST_CLIENT_SECRET,
                 code='bad',
-                redirect_uri='https://www.site.com',
+                redirect_uri=DO_OAUTH_POST_REDIRECT_URI,
                 grant_type='authorization_code'
             )
 
@@ -199,35 +237,34 @@ class TestDoOAUTHPost(unittest.TestCase):
         with self.assertRaises(PCORequestException):
             pypco.user_auth_helpers._do_oauth_post( #pylint: disable=protected-access
                 'https://api.planningcenteronline.com/oauth/token',
-                client_id='id',
-                client_secret='secret',
+                client_id=DO_OAUTH_POST_CLIENT_ID,
+                client_secret=DO_OAUTH_POST_CLIENT_SECRET,
                 code='server_error',
-                redirect_uri='https://www.site.com',
+                redirect_uri=DO_OAUTH_POST_REDIRECT_URI,
                 grant_type='authorization_code'
             )
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_successful_post(self, mock_post): #pylint: disable=unused-argument
+    def test_successful_post(self):
         """Ensure successful post request execution with correct parameters."""
 
         response = pypco.user_auth_helpers._do_oauth_post( #pylint: disable=protected-access
             'https://api.planningcenteronline.com/oauth/token',
-            client_id='id',
-            client_secret='secret',
+            client_id=DO_OAUTH_POST_CLIENT_ID,
+            client_secret=DO_OAUTH_POST_CLIENT_SECRET,
             code='good',
-            redirect_uri='https://www.site.com',
+            redirect_uri=DO_OAUTH_POST_REDIRECT_URI,
             grant_type='authorization_code'
         )
 
         self.assertEqual(200, response.status_code)
 
-        mock_post.assert_called_once_with(
+        self.mock_post.assert_called_once_with(
             'https://api.planningcenteronline.com/oauth/token',
             data={
-                'client_id': 'id',
-                'client_secret': 'secret',
+                'client_id': DO_OAUTH_POST_CLIENT_ID,
+                'client_secret': DO_OAUTH_POST_CLIENT_SECRET,
                 'code': 'good',
-                'redirect_uri': 'https://www.site.com',
+                'redirect_uri': DO_OAUTH_POST_REDIRECT_URI,
                 'grant_type': 'authorization_code'
             },
             headers={
@@ -236,25 +273,22 @@ class TestDoOAUTHPost(unittest.TestCase):
             timeout=30
         )
 
-class TestGetOAuthAccessToken(unittest.TestCase):
+class TestGetOAuthAccessToken(MockedPostTestCase):
     """Test pypco functionality for getting oauth access tokens"""
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_valid_creds(self, mock_post): #pylint: disable=W0613
+    def test_valid_creds(self):
         """Ensure we can authenticate successfully with valid creds."""
 
-        self.assertIn(
-            'access_token',
-            list(
-                pypco.get_oauth_access_token(
-                    'id',
-                    'secret',
-                    'good',
-                    'https://www.site.com/').keys()
-            )
+        token = get_oauth_access_token(
+            'id',
+            'secret',
+            'good',
+            'https://www.site.com/'
         )
 
-        mock_post.assert_called_once_with(
+        self.assertIn('access_token', token)
+
+        self.mock_post.assert_called_once_with(
             'https://api.planningcenteronline.com/oauth/token',
             data={
                 'client_id': 'id',
@@ -269,12 +303,11 @@ class TestGetOAuthAccessToken(unittest.TestCase):
             timeout=30
         )
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_invalid_code(self, mock_post): #pylint: disable=W0613
+    def test_invalid_code(self):
         """Ensure error response with invalid status code"""
 
         with self.assertRaises(PCORequestException) as err_cm:
-            pypco.get_oauth_access_token(
+            get_oauth_access_token(
                 'id',
                 'secret',
                 'bad',
@@ -284,7 +317,7 @@ class TestGetOAuthAccessToken(unittest.TestCase):
         self.assertEqual(401, err_cm.exception.status_code)
         self.assertEqual('{"test_key": "test_value"}', err_cm.exception.response_body)
 
-        mock_post.assert_called_once_with(
+        self.mock_post.assert_called_once_with(
             'https://api.planningcenteronline.com/oauth/token',
             data={
                 'client_id': 'id',
@@ -299,25 +332,21 @@ class TestGetOAuthAccessToken(unittest.TestCase):
             timeout=30
         )
 
-class TestGetOAuthRefreshToken(unittest.TestCase):
+class TestGetOAuthRefreshToken(MockedPostTestCase):
     """Test pypco functionality for getting oauth refresh tokens"""
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_valid_refresh_token(self, mock_post):
+    def test_valid_refresh_token(self):
         """Verify successful refresh with valid token."""
 
-        self.assertIn(
-            'access_token',
-            list(
-                pypco.get_oauth_refresh_token(
-                    'id',
-                    'secret',
-                    'refresh_good'
-                ).keys()
-            )
+        token = get_oauth_refresh_token(
+            'id',
+            'secret',
+            'refresh_good'
         )
 
-        mock_post.assert_called_once_with(
+        self.assertIn('access_token', token)
+
+        self.mock_post.assert_called_once_with(
             'https://api.planningcenteronline.com/oauth/token',
             data={
                 'client_id': 'id',
@@ -331,12 +360,11 @@ class TestGetOAuthRefreshToken(unittest.TestCase):
             timeout=30
         )
 
-    @mock.patch('requests.post', side_effect=mock_oauth_response)
-    def test_invalid_refresh_token(self, mock_post):
+    def test_invalid_refresh_token(self):
         """Verify refresh fails with invalid token."""
 
         with self.assertRaises(PCORequestException) as err_cm:
-            pypco.get_oauth_refresh_token(
+            get_oauth_refresh_token(
                 'id',
                 'secret',
                 'refresh_bad'
@@ -345,7 +373,7 @@ class TestGetOAuthRefreshToken(unittest.TestCase):
         self.assertEqual(401, err_cm.exception.status_code)
         self.assertEqual('{"test_key": "test_value"}', err_cm.exception.response_body)
 
-        mock_post.assert_called_once_with(
+        self.mock_post.assert_called_once_with(
             'https://api.planningcenteronline.com/oauth/token',
             data={
                 'client_id': 'id',